@@ -5,6 +5,7 @@ from rdflib import Graph, Namespace, URIRef, Literal, RDF  # For RDF graph handl
 import nltk  # For natural language processing (lemmatization)
 from nltk.stem import WordNetLemmatizer  # Word lemmatizer from NLTK
 import pandas as pd  # For reading and processing tabular data
+from kg_io import open_input, open_output, rdf_format, compression_level  # For compressed streaming input and output
 
 # Download necessary NLTK resources
 nltk.download('wordnet')
@@ -122,63 +123,69 @@ def assign_type(subj, subj_uri, g, typed_subjects):
         typed_subjects.add(subj_uri)
         print(f"Assigned rdf:type schema:Organization to subject: {subj}")
 
-# Initialize an empty RDF graph
-g = Graph()
-g.bind("foaf", FOAF)
-g.bind("prov", PROV)
-g.bind("schema", SCHEMA)
-
-# Read the input CSV file using pandas
-df = pd.read_csv(csv_path)
-
-# Initialize counters for statistics
-typed_subjects = set()
-triples_processed = 0
-triples_added = 0
-triples_discarded = 0
-
-# Iterate over each row in the CSV
-for _, row in df.iterrows():
-    sentence = row['Sentences']  # Extract the sentence text
-    triple_string = row['Extracted Triples']  # Extract the triple set
-    print(f"Processing sentence: {sentence}")
-    triples = extract_triples(triple_string)  # Extract triples from the string
-
-    for subj, pred, obj in triples:
-        triples_processed += 1
-        if is_valid_triple(subj, pred, obj):
-            namespace, mapped_pred = get_valid_predicate(pred)  # Get valid predicate URI
-            subj_name = clean_name(subj)  # Clean subject name
-            obj_name = clean_name(obj)  # Clean object name
-            subj_uri = SCHEMA[subj_name]  # Create subject URI
-            obj_uri = SCHEMA[obj_name]  # Create object URI
-            pred_uri = namespace[mapped_pred]  # Full predicate URI
-
-            g.add((subj_uri, pred_uri, obj_uri))  # Add triple to graph
-            triples_added += 1
-            print(f"Triple ADDED: ({subj}, {pred}, {obj}) -> Predicate: {pred_uri}")
-
-            if subj_uri not in typed_subjects:
-                assign_type(subj, subj_uri, g, typed_subjects)  # Assign rdf:type if needed
-        else:
-            triples_discarded += 1
-
-# Serialize the RDF graph to Turtle file format
-g.serialize(destination=ttl_output_path, format="turtle")
-
-# Reformat Turtle file to add blank lines after each triple
-with open(ttl_output_path, 'r', encoding='utf-8') as f:
-    lines = f.readlines()
-
-with open(ttl_output_path, 'w', encoding='utf-8') as f:
-    for line in lines:
-        f.write(line)
-        if line.strip().endswith('.'):
-            f.write('\n')
-
-# Output the final processing report
-print("\n=== Final Report ===")
-print(f"Total triples processed: {triples_processed}")
-print(f"Total triples added: {triples_added}")
-print(f"Total triples discarded: {triples_discarded}")
-print(f"TTL file saved successfully at: {ttl_output_path}")
+# Function to build the RDF graph from a CSV file path (.csv, .csv.gz, .csv.xz) or file-like object
+def convert(source):
+    # Initialize an empty RDF graph
+    g = Graph()
+    g.bind("foaf", FOAF)
+    g.bind("prov", PROV)
+    g.bind("schema", SCHEMA)
+
+    # Read the input CSV file using pandas
+    if isinstance(source, str):
+        with open_input(source) as f:
+            df = pd.read_csv(f)
+    else:
+        df = pd.read_csv(source)
+
+    # Initialize counters for statistics
+    typed_subjects = set()
+    stats = {"processed": 0, "added": 0, "discarded": 0}
+
+    # Iterate over each row in the CSV
+    for _, row in df.iterrows():
+        sentence = row['Sentences']  # Extract the sentence text
+        triple_string = row['Extracted Triples']  # Extract the triple set
+        print(f"Processing sentence: {sentence}")
+        triples = extract_triples(triple_string)  # Extract triples from the string
+
+        for subj, pred, obj in triples:
+            stats["processed"] += 1
+            if is_valid_triple(subj, pred, obj):
+                namespace, mapped_pred = get_valid_predicate(pred)  # Get valid predicate URI
+                subj_name = clean_name(subj)  # Clean subject name
+                obj_name = clean_name(obj)  # Clean object name
+                subj_uri = SCHEMA[subj_name]  # Create subject URI
+                obj_uri = SCHEMA[obj_name]  # Create object URI
+                pred_uri = namespace[mapped_pred]  # Full predicate URI
+
+                g.add((subj_uri, pred_uri, obj_uri))  # Add triple to graph
+                stats["added"] += 1
+                print(f"Triple ADDED: ({subj}, {pred}, {obj}) -> Predicate: {pred_uri}")
+
+                if subj_uri not in typed_subjects:
+                    assign_type(subj, subj_uri, g, typed_subjects)  # Assign rdf:type if needed
+            else:
+                stats["discarded"] += 1
+
+    return g, stats
+
+if __name__ == "__main__":
+    g, stats = convert(csv_path)
+
+    # Serialize the RDF graph to Turtle (or N-Triples for .nt outputs)
+    lines = g.serialize(format=rdf_format(ttl_output_path)).splitlines(keepends=True)
+
+    # Write the file with a blank line after each triple, compressing on a background thread
+    with open_output(ttl_output_path, compression_level) as f:
+        for line in lines:
+            f.write(line)
+            if line.strip().endswith('.'):
+                f.write('\n')
+
+    # Output the final processing report
+    print("\n=== Final Report ===")
+    print(f"Total triples processed: {stats['processed']}")
+    print(f"Total triples added: {stats['added']}")
+    print(f"Total triples discarded: {stats['discarded']}")
+    print(f"TTL file saved successfully at: {ttl_output_path}")
@@ -1,5 +1,6 @@
 from rdflib import Graph, Namespace, URIRef, Literal
 from rdflib.namespace import RDF, RDFS, FOAF, XSD
+from kg_io import write_graph, compression_level
 
 # Create an RDF graph
 kg = Graph()
@@ -44,4 +45,4 @@ for row in kg.query(query):
     print(f"{row.person} feels {row.emotion}")
 
 # Save the Knowledge Graph in Turtle format
-kg.serialize("knowledge_graph.ttl", format="turtle")
+write_graph(kg, "knowledge_graph.ttl", compression_level)
@@ -2,6 +2,7 @@ import csv
 from rdflib import Graph, URIRef, Literal, Namespace
 from rdflib.namespace import RDF, XSD
 import os
+from kg_io import open_input, write_graph, compression_level
 
 # Define Namespace
 EX = Namespace("https://example.org/")
@@ -19,7 +20,7 @@ if not os.path.exists(csv_path):
     exit()
 
 # Read CSV file
-with open(csv_path, newline='', encoding='utf-8') as csvfile:
+with open_input(csv_path) as csvfile:
     csv_reader = csv.reader(csvfile)
 
     # Ignore header
@@ -59,6 +60,6 @@ with open(csv_path, newline='', encoding='utf-8') as csvfile:
         print(f"Added: ({subject}, {predicate}, {obj})")  # Debugging print
 
 # Save Knowledge Graph to Turtle format
-kg.serialize("knowledge_graph_from_csv.ttl", format="turtle")
+write_graph(kg, "knowledge_graph_from_csv.ttl", compression_level)
 
 print("Knowledge Graph saved as 'knowledge_graph_from_csv.ttl'")
@@ -0,0 +1,225 @@
+import argparse  # For command line arguments
+import queue  # For handing parsed triples from the parser thread to the reader
+import threading  # For running the push-based rdflib parsers as a stream
+from hashlib import blake2b  # For fixed-width triple hashes
+import numpy as np  # For sorted hash arrays
+from rdflib import Graph, BNode  # For RDF graph handling
+from rdflib.store import Store  # For receiving parsed triples without storing them
+from kg_io import open_input, open_output, rdf_format  # For compressed streaming input and output
+
+
+# Number of triples handed over at once by the parser thread, and batches that can be waiting
+batch_size = 100000
+max_pending_batches = 8
+
+
+# Raised inside the parser thread when the reader stops early
+class _StopParsing(Exception):
+    pass
+
+
+# Store that passes every parsed triple to a callback instead of keeping it
+class _SinkStore(Store):
+    def __init__(self, emit):
+        super().__init__()
+        self.emit = emit
+
+    def add(self, triple, context, quoted=False):
+        self.emit(triple)
+
+
+# Re-iterable view over an RDF file that streams its triples without building a Graph.
+# rdflib parsers push triples into a store, so the parser runs on a background thread
+# and hands batches of triples to the reader through a bounded queue.
+# Blank nodes are renamed by order of first appearance, which is the same on every
+# pass over the same file, so labels computed on one pass are valid on the next.
+class RDFFile:
+    def __init__(self, path, format):
+        self.path = path
+        self.format = format
+
+    def __iter__(self):
+        batches = queue.Queue(maxsize=max_pending_batches)
+        stopped = threading.Event()
+        batch = []
+
+        def emit(triple):
+            if stopped.is_set():
+                raise _StopParsing()
+            batch.append(triple)
+            if len(batch) >= batch_size:
+                batches.put(list(batch))
+                batch.clear()
+
+        def parse():
+            try:
+                with open_input(self.path) as f:
+                    Graph(store=_SinkStore(emit)).parse(file=f, format=self.format)
+                batches.put(list(batch))
+                batches.put(None)
+            except _StopParsing:
+                batches.put(None)
+            except Exception as e:
+                batches.put(e)
+
+        thread = threading.Thread(target=parse, daemon=True)
+        thread.start()
+        bnode_ids = {}
+        try:
+            while True:
+                item = batches.get()
+                if item is None:
+                    break
+                if isinstance(item, Exception):
+                    raise ValueError(f"Could not parse {self.path}: {item}") from item
+                for triple in item:
+                    yield tuple(bnode_ids.setdefault(term, BNode(f"n{len(bnode_ids)}"))
+                                if isinstance(term, BNode) else term for term in triple)
+        finally:
+            # Unblock the parser thread if the reader stopped before the end
+            stopped.set()
+            while thread.is_alive():
+                try:
+                    batches.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+
+
+# Function to open an RDF file (optionally .gz/.xz compressed) as an iterable of triples
+# Invalid lines raise an error instead of being skipped, so a diff never misses triples.
+def open_triples(path):
+    return RDFFile(path, rdf_format(path))
+
+
+# Function to give every blank node a label derived from its neighbourhood.
+# The qualifier nodes created by ontologies.py are identified by their incoming
+# (subject, predicate) and their outgoing type, relatedTo and qualifierValue
+# triples, so the same qualifier gets the same label in every version of the graph.
+def bnode_labels(triples):
+    signatures = {}
+    for s, p, o in triples:
+        if isinstance(s, BNode):
+            signatures.setdefault(s, []).append(
+                f"> {p.n3()} {'[]' if isinstance(o, BNode) else o.n3()}")
+        if isinstance(o, BNode):
+            signatures.setdefault(o, []).append(
+                f"< {'[]' if isinstance(s, BNode) else s.n3()} {p.n3()}")
+    labels = {}
+    for node, signature in signatures.items():
+        digest = blake2b('\n'.join(sorted(signature)).encode('utf-8'), digest_size=16)
+        labels[node] = BNode('b' + digest.hexdigest())
+    return labels
+
+
+# Function to write a triple as a canonical N-Triples line
+def canonical_line(triple, labels):
+    return ' '.join(labels.get(term, term).n3() for term in triple) + ' .'
+
+
+# Function to hash a canonical line into a 64-bit integer
+def triple_hash(line):
+    return int.from_bytes(blake2b(line.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+# Function to iterate over the canonical N-Triples lines of a graph
+def canonical_lines(triples):
+    labels = bnode_labels(triples)
+    for triple in triples:
+        yield canonical_line(triple, labels)
+
+
+# Function to build the sorted array of unique triple hashes of a graph in a single pass.
+# Triples without blank nodes are hashed as they stream by; the few triples with blank
+# nodes are kept until the whole graph is read and their labels are known.
+# Returns the hashes and the blank node labels for later passes over the same file.
+def hash_triples(triples):
+    chunks = []
+    batch = []
+    bnode_triples = []
+    for triple in triples:
+        if any(isinstance(term, BNode) for term in triple):
+            bnode_triples.append(triple)
+            continue
+        batch.append(triple_hash(canonical_line(triple, {})))
+        if len(batch) >= batch_size:
+            chunks.append(np.unique(np.array(batch, dtype=np.uint64)))
+            batch = []
+    labels = bnode_labels(bnode_triples)
+    batch.extend(triple_hash(canonical_line(triple, labels)) for triple in bnode_triples)
+    chunks.append(np.array(batch, dtype=np.uint64))
+    return np.unique(np.concatenate(chunks)), labels  # Sorted and deduplicated
+
+
+# Function to find the hashes of a sorted array that are missing from another sorted array.
+# Each value of `a` is located in `b` with a binary search, which walks both sorted
+# arrays in a single vectorized merge-scan.
+def sorted_difference(a, b):
+    if len(b) == 0:
+        return a
+    positions = np.searchsorted(b, a)
+    found = b[np.minimum(positions, len(b) - 1)] == a
+    return a[~found]
+
+
+# Function to iterate over the canonical lines of a graph whose hash is in a sorted array.
+# Every hash is emitted once, even if the file repeats the triple.
+def select_lines(triples, labels, hashes):
+    emitted = np.zeros(len(hashes), dtype=bool)
+    batch = []
+
+    def flush():
+        lines = [line for line, _ in batch]
+        values = np.array([value for _, value in batch], dtype=np.uint64)
+        positions = np.minimum(np.searchsorted(hashes, values), len(hashes) - 1)
+        for line, position, found in zip(lines, positions, hashes[positions] == values):
+            if found and not emitted[position]:
+                emitted[position] = True
+                yield line
+
+    if len(hashes) == 0:
+        return
+    for triple in triples:
+        line = canonical_line(triple, labels)
+        batch.append((line, triple_hash(line)))
+        if len(batch) >= batch_size:
+            yield from flush()
+            batch = []
+    yield from flush()
+
+
+# Function to compute the hashes of the triples added and removed between two versions of a graph.
+# Only the two sorted hash arrays (and the blank node labels of each file) are kept in memory.
+def diff_graphs(old_path, new_path):
+    old_hashes, old_labels = hash_triples(open_triples(old_path))
+    new_hashes, new_labels = hash_triples(open_triples(new_path))
+    added = sorted_difference(new_hashes, old_hashes)
+    removed = sorted_difference(old_hashes, new_hashes)
+    return added, removed, {old_path: old_labels, new_path: new_labels}
+
+
+# Function to write the difference as an N-Triples patch ("D" = removed, "A" = added).
+# The text of the changed triples is recovered with one more pass over each graph.
+def write_patch(old_path, new_path, added, removed, labels, patch_path, level=None):
+    with open_output(patch_path, level) as f:
+        for path, hashes, marker in ((old_path, removed, "D"), (new_path, added, "A")):
+            if len(hashes) == 0:
+                continue
+            for line in select_lines(open_triples(path), labels[path], hashes):
+                f.write(f"{marker} {line}\n")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compute the triples added and removed between two KG versions.")
+    parser.add_argument("old", help="previous version of the graph (e.g. output_scene0.ttl)")
+    parser.add_argument("new", help="new version of the graph")
+    parser.add_argument("-o", "--output", default="diff.patch.nt", help="path of the N-Triples patch")
+    parser.add_argument("--level", type=int, default=None, help="compression level for .gz/.xz outputs")
+    args = parser.parse_args()
+
+    added, removed, labels = diff_graphs(args.old, args.new)
+    write_patch(args.old, args.new, added, removed, labels, args.output, args.level)
+
+    print("\n=== Diff Report ===")
+    print(f"Triples added: {len(added)}")
+    print(f"Triples removed: {len(removed)}")
+    print(f"Patch file saved successfully at: {args.output}")
@@ -0,0 +1,156 @@
+import gzip  # For .gz files
+import io  # For file-like wrappers
+import lzma  # For .xz files
+import queue  # For handing chunks to and from the background threads
+import threading  # For overlapping (de)compression with mapping work
+from rdflib.util import guess_format  # For detecting the RDF serialization
+
+# Default compression level: gzip compresslevel (1-9) or xz preset (0-9)
+compression_level = 6
+
+# Size of the chunks passed between the background thread and the caller
+chunk_size = 1 << 20
+# Number of chunks that can be waiting in a queue
+max_pending_chunks = 8
+
+
+# Function to detect the compression of a file from its extension
+def compression_of(path):
+    if path.endswith(".gz"):
+        return "gzip"
+    if path.endswith(".xz"):
+        return "xz"
+    return None
+
+
+# Function to detect the RDF format of a file, ignoring the compression extension
+def rdf_format(path):
+    if compression_of(path):
+        path = path[:-3]
+    return guess_format(path) or "turtle"
+
+
+# Function to open a file for binary reading or writing, decompressing or compressing on the fly
+def _open_binary(path, mode, level=None):
+    level = compression_level if level is None else level
+    kind = compression_of(path)
+    if kind == "gzip":
+        return gzip.open(path, mode, compresslevel=level) if "w" in mode else gzip.open(path, mode)
+    if kind == "xz":
+        return lzma.open(path, mode, preset=level) if "w" in mode else lzma.open(path, mode)
+    return open(path, mode)
+
+
+# Raw stream whose data is read and decompressed ahead of time on a background thread
+class _PrefetchReader(io.RawIOBase):
+    def __init__(self, path):
+        self.name = path
+        self.chunks = queue.Queue(maxsize=max_pending_chunks)
+        self.pending = b""
+        self.error = None
+        self.stopped = False
+        self.thread = threading.Thread(target=self._fill, args=(path,), daemon=True)
+        self.thread.start()
+
+    def _fill(self, path):
+        try:
+            with _open_binary(path, "rb") as f:
+                while not self.stopped:
+                    data = f.read(chunk_size)
+                    if not data:
+                        break
+                    self.chunks.put(data)
+        except Exception as e:
+            self.error = e
+        finally:
+            self.chunks.put(None)  # End of file
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        if not self.pending:
+            if self.chunks is None:
+                return 0
+            data = self.chunks.get()
+            if data is None:
+                self.chunks = None
+                if self.error is not None:
+                    raise self.error
+                return 0
+            self.pending = data
+        size = min(len(buffer), len(self.pending))
+        buffer[:size] = self.pending[:size]
+        self.pending = self.pending[size:]
+        return size
+
+    def close(self):
+        # Unblock the background thread if the file is closed before the end
+        self.stopped = True
+        while self.chunks is not None and self.thread.is_alive():
+            try:
+                self.chunks.get(timeout=0.1)
+            except queue.Empty:
+                pass
+        super().close()
+
+
+# Raw stream whose data is compressed and written on a background thread
+class _BackgroundWriter(io.RawIOBase):
+    def __init__(self, path, level=None):
+        self.name = path
+        self.chunks = queue.Queue(maxsize=max_pending_chunks)
+        self.error = None
+        self.thread = threading.Thread(target=self._drain, args=(path, level), daemon=True)
+        self.thread.start()
+
+    def _drain(self, path, level):
+        finished = False
+        try:
+            with _open_binary(path, "wb", level) as f:
+                while True:
+                    data = self.chunks.get()
+                    if data is None:
+                        finished = True
+                        break
+                    f.write(data)
+        except Exception as e:
+            self.error = e
+            # Keep consuming so the producer never blocks on a full queue
+            while not finished:
+                finished = self.chunks.get() is None
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        if self.error is not None:
+            raise self.error
+        self.chunks.put(bytes(data))
+        return len(data)
+
+    def close(self):
+        if not self.closed:
+            self.chunks.put(None)
+            self.thread.join()
+        super().close()
+        if self.error is not None:
+            raise self.error
+
+
+# Function to open a (possibly .gz/.xz compressed) file for reading
+def open_input(path, text=True):
+    stream = io.BufferedReader(_PrefetchReader(path), buffer_size=chunk_size)
+    return io.TextIOWrapper(stream, encoding="utf-8", newline="") if text else stream
+
+
+# Function to open a (possibly .gz/.xz compressed) file for writing
+def open_output(path, level=None, text=True):
+    stream = io.BufferedWriter(_BackgroundWriter(path, level), buffer_size=chunk_size)
+    return io.TextIOWrapper(stream, encoding="utf-8") if text else stream
+
+
+# Function to serialize a graph into a (possibly compressed) Turtle or N-Triples file
+def write_graph(graph, path, level=None, format=None):
+    with open_output(path, level, text=False) as f:
+        graph.serialize(destination=f, format=format or rdf_format(path), encoding="utf-8")
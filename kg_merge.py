@@ -0,0 +1,77 @@
+import argparse  # For command line arguments
+import os  # For replacing the output file
+import numpy as np  # For the compact hash set
+from kg_io import open_output  # For compressed streaming output
+from kg_diff import open_triples, canonical_lines, triple_hash, sorted_difference  # Triple canonicalization and hashing
+
+
+# Set of triple hashes stored as one sorted uint64 array (8 bytes per unique triple)
+class TripleHashSet:
+    def __init__(self):
+        self.hashes = np.empty(0, dtype=np.uint64)
+
+    def __len__(self):
+        return len(self.hashes)
+
+    # Return the hashes of a sorted, unique array that are not in the set yet
+    def unseen(self, hashes):
+        return sorted_difference(hashes, self.hashes)
+
+    def add(self, hashes):
+        self.hashes = np.union1d(self.hashes, hashes)
+
+
+# Function to merge the scene graphs into one N-Triples file without duplicate triples
+def merge_graphs(paths, output_path, level=None):
+    seen = TripleHashSet()
+    report = []
+
+    # Write next to the output and rename on success, so a failed merge (for example a
+    # scene that cannot be parsed) never leaves a truncated file. The name keeps the
+    # .gz/.xz extension that selects the compression.
+    partial_path = os.path.join(os.path.dirname(output_path), ".partial-" + os.path.basename(output_path))
+    try:
+        with open_output(partial_path, level) as out:
+            for path in paths:
+                lines = list(canonical_lines(open_triples(path)))  # One scene at a time
+                hashes = np.fromiter((triple_hash(line) for line in lines), dtype=np.uint64, count=len(lines))
+
+                # Keep the first occurrence of every triple that no previous scene contained
+                unique_hashes, first_index = np.unique(hashes, return_index=True)
+                new_hashes = seen.unseen(unique_hashes)
+                keep = np.sort(first_index[np.isin(unique_hashes, new_hashes, assume_unique=True)])
+                for i in keep:
+                    out.write(lines[i] + '\n')
+                seen.add(new_hashes)
+
+                total = len(lines)
+                written = len(keep)
+                ratio = (total - written) / total if total else 0.0
+                report.append((path, total, written, ratio))
+                print(f"Merged {path}: {written}/{total} triples written, duplicate ratio {ratio:.2%}")
+    except BaseException:
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
+        raise
+    os.replace(partial_path, output_path)
+
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Merge the per-scene graphs into one graph without duplicate triples.")
+    parser.add_argument("inputs", nargs="+", help="scene graphs to merge (e.g. output_ttl/output_scene*.ttl)")
+    parser.add_argument("-o", "--output", default="merged_graph.nt", help="path of the merged N-Triples file")
+    parser.add_argument("--level", type=int, default=None, help="compression level for .gz/.xz outputs")
+    args = parser.parse_args()
+
+    report = merge_graphs(args.inputs, args.output, level=args.level)
+
+    total = sum(r[1] for r in report)
+    written = sum(r[2] for r in report)
+    print("\n=== Merge Report ===")
+    print(f"Scenes merged: {len(report)}")
+    print(f"Total triples read: {total}")
+    print(f"Unique triples written: {written}")
+    print(f"Duplicate ratio: {(total - written) / total if total else 0.0:.2%}")
+    print(f"Merged graph saved successfully at: {args.output}")
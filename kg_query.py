@@ -0,0 +1,216 @@
+import argparse  # For command line arguments
+import base64  # For storing the term filters in JSON
+import json  # For storing the per-file summaries
+import os  # For file modification times
+import math  # For sizing the term filters
+import re  # For extracting the scene number from a file name
+from hashlib import blake2b  # For hashing IRIs into the term filters
+from concurrent.futures import ProcessPoolExecutor, as_completed  # For querying the files in parallel
+from rdflib import Graph, URIRef  # For RDF graph handling
+from rdflib.plugins.sparql import prepareQuery  # For parsing SPARQL queries
+from kg_diff import open_triples  # For streaming the triples of RDF files
+
+# Algebra nodes that keep a query conjunctive: if a file cannot match one of
+# the triple patterns below them, it cannot produce any result
+conjunctive_nodes = ["SelectQuery", "Project", "Distinct", "Reduced", "Slice", "Filter", "OrderBy", "ToMultiSet"]
+
+
+# Function to label a result with its source scene (output_scene12.ttl -> scene12)
+def scene_label(path):
+    match = re.search(r'scene(\d+)', os.path.basename(path))
+    return f"scene{match.group(1)}" if match else os.path.splitext(os.path.basename(path))[0]
+
+
+# Target false-positive rate of the per-file term filters
+term_filter_error_rate = 0.01
+
+
+# Bloom filter over the IRIs of a graph file, packed 8 bits per byte and sized
+# from the number of IRIs so it stays around 1.2 bytes per IRI at a 1% error rate
+class TermFilter:
+    def __init__(self, num_bits, num_hashes, bits=None):
+        self.num_bits = num_bits
+        self.num_hashes = num_hashes
+        self.bits = bytearray(bits) if bits is not None else bytearray((num_bits + 7) // 8)
+
+    @classmethod
+    def for_terms(cls, terms, error_rate=term_filter_error_rate):
+        count = max(len(terms), 1)
+        num_bits = max(64, math.ceil(-count * math.log(error_rate) / math.log(2) ** 2))
+        term_filter = cls(num_bits, max(1, round(num_bits / count * math.log(2))))
+        for term in terms:
+            term_filter.add(term)
+        return term_filter
+
+    # Derive the bit positions of a term from one 64-bit hash (double hashing)
+    def _positions(self, term):
+        digest = blake2b(term.encode("utf-8"), digest_size=8).digest()
+        h1, h2 = int.from_bytes(digest[:4], "big"), int.from_bytes(digest[4:], "big") | 1
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    def add(self, term):
+        for position in self._positions(term):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, term):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(term))
+
+    def to_json(self):
+        return {"bits": self.num_bits, "hashes": self.num_hashes,
+                "data": base64.b64encode(bytes(self.bits)).decode("ascii")}
+
+    @classmethod
+    def from_json(cls, data):
+        return cls(data["bits"], data["hashes"], base64.b64decode(data["data"]))
+
+
+# Function to build the summary of a graph file from its triples: the predicates it
+# uses and a filter over the IRIs it mentions
+def summarize_triples(triples, mtime):
+    predicates = set()
+    terms = set()
+    for s, p, o in triples:
+        predicates.add(str(p))
+        if isinstance(s, URIRef):
+            terms.add(str(s))
+        if isinstance(o, URIRef):
+            terms.add(str(o))
+    return {"mtime": mtime, "predicates": sorted(predicates),
+            "terms": TermFilter.for_terms(terms).to_json()}
+
+
+# Per-file predicate/term summaries, rebuilt when a graph file changes. They are kept
+# in memory, and cached in a JSON file only when an index path is given.
+class SceneIndex:
+    def __init__(self, index_path=None):
+        self.index_path = index_path
+        self.summaries = {}
+        if index_path and os.path.exists(index_path):
+            with open(index_path, 'r', encoding='utf-8') as f:
+                self.summaries = json.load(f)
+        self._filters = {}
+
+    # Check whether a file has a summary that is still valid
+    def is_current(self, path):
+        summary = self.summaries.get(path)
+        return (summary is not None and summary["mtime"] == os.path.getmtime(path)
+                and isinstance(summary["terms"], dict))  # Not a summary from an older index
+
+    # Store the summaries collected while querying files and save them if the index has a path
+    def add(self, summaries):
+        for path, summary in summaries.items():
+            self.summaries[path] = summary
+            self._filters.pop(path, None)
+        if summaries and self.index_path:
+            with open(self.index_path, 'w', encoding='utf-8') as f:
+                json.dump(self.summaries, f)
+
+    # Check whether a file can contain a match for every required triple pattern
+    def may_match(self, path, patterns):
+        if patterns is None:
+            return True  # The query is not a plain BGP, the file has to be queried
+        if not self.is_current(path):
+            return True  # Not summarized yet, it is summarized while it is queried
+        if path not in self._filters:
+            summary = self.summaries[path]
+            self._filters[path] = (set(summary["predicates"]), TermFilter.from_json(summary["terms"]))
+        predicates, terms = self._filters[path]
+        for s, p, o in patterns:
+            if isinstance(p, URIRef) and str(p) not in predicates:
+                return False
+            for term in (s, o):
+                if isinstance(term, URIRef) and str(term) not in terms:
+                    return False
+        return True
+
+
+# Function to collect the triple patterns every result has to match, or None if the
+# query uses OPTIONAL, UNION or other operators that make skipping files unsafe
+def required_patterns(node):
+    if node.name == "BGP":
+        return list(node.triples)
+    if node.name == "Join":
+        left = required_patterns(node.p1)
+        right = required_patterns(node.p2)
+        return None if left is None or right is None else left + right
+    if node.name in conjunctive_nodes:
+        return required_patterns(node.p)
+    return None
+
+
+# Function to turn a triple pattern into a SPARQL query, None matches anything.
+# The variables are selected explicitly so results come back in ?s ?p ?o order.
+def pattern_to_query(pattern):
+    terms = ["?" + "spo"[i] if term is None else term.n3() for i, term in enumerate(pattern)]
+    variables = [term for term in terms if term.startswith("?")]
+    return f"SELECT {' '.join(variables) or '*'} WHERE {{ {' '.join(terms)} . }}"
+
+
+# Function to get the names of the variables a query returns, in result order
+def query_vars(query):
+    return [str(var) for var in prepareQuery(query).algebra["PV"]]
+
+
+# Function to evaluate a query on a single graph file (runs in a worker process).
+# Returns the result variable names, the rows as tuples in the same order, and the
+# summary of the file built from the same parse.
+def query_file(path, query):
+    mtime = os.path.getmtime(path)
+    g = Graph()
+    for triple in open_triples(path):
+        g.add(triple)
+    result = g.query(query)
+    return [str(var) for var in result.vars], [tuple(row) for row in result], summarize_triples(g, mtime)
+
+
+# Function to evaluate a query over a set of scene graphs in parallel.
+# Yields (scene, row) pairs as soon as each file has been queried, where row
+# maps every result variable name to its value (None when unbound).
+# Files are only skipped when the index already has their summary; the others
+# are queried and their summaries are added to the index for the next query.
+def federated_query(paths, query, workers=None, index=None):
+    if isinstance(query, tuple):
+        query = pattern_to_query(query)
+    patterns = required_patterns(prepareQuery(query).algebra)
+
+    index = index if index is not None else SceneIndex()
+    candidates = [path for path in paths if index.may_match(path, patterns)]
+    print(f"Querying {len(candidates)} of {len(paths)} graph files")
+
+    summaries = {}
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(query_file, path, query): path for path in candidates}
+            for future in as_completed(futures):
+                path = futures[future]
+                variables, rows, summaries[path] = future.result()
+                for row in rows:
+                    yield scene_label(path), dict(zip(variables, row))
+    finally:
+        index.add(summaries)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a SPARQL query over the per-scene graphs without merging them.")
+    parser.add_argument("query", help="SPARQL SELECT query, or a triple pattern such as '? schema:knows ?'")
+    parser.add_argument("inputs", nargs="+", help="scene graphs to query (e.g. output_ttl/output_scene*.ttl)")
+    parser.add_argument("--workers", type=int, default=None, help="number of worker processes")
+    parser.add_argument("--index", default=None, help="cache the file summaries in this JSON file (e.g. scene_index.json)")
+    args = parser.parse_args()
+
+    query = args.query
+    if not query.lstrip().upper().startswith(("SELECT", "PREFIX", "BASE")):
+        # Triple pattern with '?' as wildcard and schema:, foaf:, prov: prefixes
+        query = "PREFIX schema: <http://schema.org/> PREFIX foaf: <http://xmlns.com/foaf/0.1/> " \
+                "PREFIX prov: <http://www.w3.org/ns/prov#> "
+        terms = ["?" + "spo"[i] if t == "?" else t for i, t in enumerate(args.query.split())]
+        variables = [t for t in terms if t.startswith("?")]
+        query += f"SELECT {' '.join(variables) or '*'} WHERE {{ {' '.join(terms)} . }}"
+
+    variables = query_vars(query)
+    print("scene", *["?" + var for var in variables], sep="\t")
+    results = 0
+    for scene, row in federated_query(args.inputs, query, workers=args.workers, index=SceneIndex(args.index)):
+        print(scene, *[row[var].n3() if row.get(var) is not None else "-" for var in variables], sep="\t")
+        results += 1
+    print(f"\nTotal results: {results}")
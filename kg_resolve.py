@@ -0,0 +1,228 @@
+import argparse  # For command line arguments
+import os  # For output file names
+import zlib  # For stable trigram hashes
+from collections import Counter, defaultdict  # For mention counts and blocking index
+import numpy as np  # For MinHash signatures
+from rdflib import URIRef, RDF  # For RDF terms
+from rdflib.namespace import OWL  # For owl:sameAs links
+from kg_diff import open_triples  # For streaming the triples of RDF files
+from kg_io import open_output  # For compressed streaming output
+
+# Namespace in which csv_to_ttl.py mints entity URIs
+SCHEMA = "http://schema.org/"
+
+# Tokens ignored when comparing names ("dr_smith" -> "smith", "smith_s" -> "smith")
+honorifics = ["dr", "mr", "mrs", "ms", "miss", "prof", "sir", "madam", "the", "s"]
+
+# Minimum character trigram similarity for two different names to be merged
+similarity_threshold = 0.8
+# MinHash/LSH parameters: names whose trigram signatures agree on all rows of any
+# band become candidates (about 99.9% of pairs at similarity 0.8, 5% at 0.3)
+lsh_bands = 20
+lsh_rows = 5
+# Blocks larger than this are not compared pairwise: their members are sorted by
+# name and each one is only compared with its next window_size neighbours
+max_block_size = 500
+window_size = 10
+# Names processed at once when computing MinHash signatures
+signature_batch = 10000
+
+
+# Function to normalize the local name of an entity URI into its name tokens
+def name_tokens(uri):
+    local_name = str(uri)[len(SCHEMA):].lower()
+    return [t for t in local_name.split("_") if t and t not in honorifics]
+
+
+# Function to compute the Soundex code of a word
+def soundex(word):
+    codes = {c: str(d) for d, letters in enumerate(["aeiouyhw", "bfpv", "cgjkqsxz", "dt", "l", "mn", "r"])
+             for c in letters}
+    word = ''.join(c for c in word if c.isalpha())
+    if not word:
+        return ""
+    result = word[0].upper()
+    last = codes.get(word[0], "")
+    for c in word[1:]:
+        code = codes.get(c, "")
+        if code and code != "0" and code != last:
+            result += code
+        if c not in "hw":
+            last = code
+    return (result + "000")[:4]
+
+
+# Function to compute the character trigrams of a normalized name
+def trigrams(name):
+    padded = f"  {name} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+# Function to compute the MinHash signatures of the trigram sets of many names.
+# Row i holds lsh_bands * lsh_rows minimum hash values of names[i].
+def minhash_signatures(gram_sets):
+    prime = np.uint64(4294967311)  # Smallest prime above 2^32
+    rng = np.random.default_rng(0)  # Fixed seed: the same names always get the same signatures
+    size = lsh_bands * lsh_rows
+    a = rng.integers(1, 1 << 31, size=size, dtype=np.uint64)
+    b = rng.integers(0, 1 << 32, size=size, dtype=np.uint64)
+    signatures = np.empty((len(gram_sets), size), dtype=np.uint64)
+    for start in range(0, len(gram_sets), signature_batch):
+        batch = gram_sets[start:start + signature_batch]
+        hashes = np.array([zlib.crc32(gram.encode("utf-8")) for grams in batch for gram in grams], dtype=np.uint64)
+        offsets = np.cumsum([0] + [len(grams) for grams in batch[:-1]])
+        permuted = (hashes[:, None] * a + b) % prime
+        signatures[start:start + len(batch)] = np.minimum.reduceat(permuted, offsets, axis=0)
+    return signatures
+
+
+# Function to list the pairs to compare inside a block: all pairs for small blocks,
+# and a sliding window over the members sorted by name for large ones
+def block_pairs(members, names):
+    if len(members) <= max_block_size:
+        return ((members[x], members[y]) for x in range(len(members)) for y in range(x + 1, len(members)))
+    members = sorted(members, key=lambda i: names[i])
+    return ((members[x], members[y]) for x in range(len(members))
+            for y in range(x + 1, min(x + 1 + window_size, len(members))))
+
+
+# Union-find structure used to group matching entities
+class DisjointSet:
+    def __init__(self, size):
+        self.parent = list(range(size))
+
+    def find(self, i):
+        while self.parent[i] != i:
+            self.parent[i] = self.parent[self.parent[i]]
+            i = self.parent[i]
+        return i
+
+    def union(self, i, j):
+        root_i, root_j = self.find(i), self.find(j)
+        if root_i != root_j:
+            self.parent[max(root_i, root_j)] = min(root_i, root_j)
+
+
+# Function to count the entity mentions in the scene graphs
+def collect_mentions(paths):
+    mentions = Counter()
+    classes = set()
+    for path in paths:
+        for s, p, o in open_triples(path):
+            if p == RDF.type:
+                classes.add(o)  # Class URIs such as schema:Person are not entities
+            for term in (s, o):
+                if isinstance(term, URIRef) and str(term).startswith(SCHEMA):
+                    mentions[term] += 1
+    for cls in classes:
+        mentions.pop(cls, None)
+    return mentions
+
+
+# Function to group the entity URIs that refer to the same entity
+def resolve_entities(mentions):
+    entities = sorted(mentions)
+    groups = DisjointSet(len(entities))
+
+    # URIs with the same normalized name are merged directly, without comparisons
+    by_name = defaultdict(list)
+    for i, uri in enumerate(entities):
+        name = " ".join(name_tokens(uri))
+        if name:
+            by_name[name].append(i)
+    for members in by_name.values():
+        for i in members[1:]:
+            groups.union(members[0], i)
+
+    # Different names are compared only when they are candidates: they share an
+    # LSH band of their trigram MinHash signatures, or the same Soundex code
+    names = sorted(by_name)
+    grams = [trigrams(name) for name in names]
+    signatures = minhash_signatures(grams)
+    bands = [list(map(bytes, signatures[:, band * lsh_rows:(band + 1) * lsh_rows])) for band in range(lsh_bands)]
+    name_groups = DisjointSet(len(names))
+    compared = 0
+
+    def compare(i, j):
+        nonlocal compared
+        if name_groups.find(i) == name_groups.find(j):
+            return
+        compared += 1
+        if len(grams[i] & grams[j]) / len(grams[i] | grams[j]) >= similarity_threshold:
+            name_groups.union(i, j)
+
+    for band, values in enumerate(bands):
+        buckets = defaultdict(list)
+        for i, key in enumerate(values):
+            buckets[key].append(i)
+        for members in buckets.values():
+            for i, j in block_pairs(members, names):
+                # Each pair is compared only in the first band the two names share
+                if not any(bands[earlier][i] == bands[earlier][j] for earlier in range(band)):
+                    compare(i, j)
+
+    phonetic = defaultdict(list)
+    for i, name in enumerate(names):
+        phonetic[" ".join(soundex(t) for t in name.split())].append(i)
+    for members in phonetic.values():
+        for i, j in block_pairs(members, names):
+            # Pairs sharing an LSH band were already compared
+            if not any(values[i] == values[j] for values in bands):
+                compare(i, j)
+    print(f"Compared {compared} candidate pairs for {len(entities)} entities ({len(names)} distinct names)")
+
+    for i, name in enumerate(names):
+        groups.union(by_name[name][0], by_name[names[name_groups.find(i)]][0])
+
+    clusters = defaultdict(list)
+    for i, uri in enumerate(entities):
+        clusters[groups.find(i)].append(uri)
+
+    # The most mentioned URI (then the shortest) becomes the canonical one
+    canonical = {}
+    for members in clusters.values():
+        if len(members) > 1:
+            target = min(members, key=lambda uri: (-mentions[uri], len(uri), str(uri)))
+            for uri in members:
+                if uri != target:
+                    canonical[uri] = target
+    return canonical
+
+
+# Function to write the owl:sameAs links as N-Triples
+def write_same_as(canonical, output_path, level=None):
+    with open_output(output_path, level) as f:
+        for uri in sorted(canonical):
+            f.write(f"{uri.n3()} {OWL.sameAs.n3()} {canonical[uri].n3()} .\n")
+
+
+# Function to rewrite a scene graph with the canonical URIs
+def rewrite_graph(path, canonical, output_path, level=None):
+    with open_output(output_path, level) as f:
+        for s, p, o in open_triples(path):
+            f.write(f"{canonical.get(s, s).n3()} {p.n3()} {canonical.get(o, o).n3()} .\n")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Resolve the same entity written differently across scene graphs.")
+    parser.add_argument("inputs", nargs="+", help="scene graphs (e.g. output_ttl/output_scene*.ttl)")
+    parser.add_argument("-o", "--output", default="same_as.nt", help="path of the owl:sameAs links")
+    parser.add_argument("--rewrite-dir", default=None,
+                        help="also write every scene graph with canonical URIs into this directory")
+    parser.add_argument("--level", type=int, default=None, help="compression level for .gz/.xz outputs")
+    args = parser.parse_args()
+
+    mentions = collect_mentions(args.inputs)
+    canonical = resolve_entities(mentions)
+    write_same_as(canonical, args.output, args.level)
+
+    if args.rewrite_dir:
+        os.makedirs(args.rewrite_dir, exist_ok=True)
+        for path in args.inputs:
+            stem = os.path.basename(path).split(".")[0]
+            rewrite_graph(path, canonical, os.path.join(args.rewrite_dir, f"{stem}_resolved.nt"), args.level)
+
+    print("\n=== Entity Resolution Report ===")
+    print(f"Entity URIs: {len(mentions)}")
+    print(f"URIs merged into a canonical URI: {len(canonical)}")
+    print(f"owl:sameAs links saved successfully at: {args.output}")
@@ -0,0 +1,127 @@
+import argparse  # For command line arguments
+import importlib  # For loading the builders once at startup
+import io  # For CSV content sent in the request body
+import json  # For request and response payloads
+import threading  # For counting requests across handler threads
+import time  # For per-request latency
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer  # For the local HTTP service
+
+# Builders that can be kept resident, and the RDF formats a job can ask for
+available_builders = ["csv_to_ttl", "ontologies", "ontologies2"]
+output_formats = {
+    "turtle": "text/turtle",
+    "nt": "application/n-triples",
+}
+
+builders = {}
+request_counter = {"count": 0}
+counter_lock = threading.Lock()
+
+
+# Function to import the builders once, which loads their ontologies and NLP resources
+def load_builders(names):
+    for name in names:
+        start = time.perf_counter()
+        module = importlib.import_module(name)
+        if hasattr(module, "download_nltk_data"):
+            module.download_nltk_data()  # ontologies2 does not download at import time
+        # Force WordNet to load now instead of inside the first (concurrent) requests
+        try:
+            module.lemmatizer.lemmatize("warm")
+        except AttributeError:
+            pass  # This builder does not use a lemmatizer
+        except LookupError as e:
+            print(f"WARNING: WordNet not available for {name}: {e}")
+        builders[name] = module
+        print(f"Loaded builder '{name}' in {time.perf_counter() - start:.2f}s")
+
+
+# Function to run one conversion job and return the serialized graph
+def run_job(job):
+    name = job.get("builder", "csv_to_ttl")
+    if name not in builders:
+        raise ValueError(f"Builder not loaded: {name}")
+    fmt = job.get("format", "turtle")
+    if fmt not in output_formats:
+        raise ValueError(f"Unsupported format: {fmt}")
+
+    if "csv_path" in job:
+        source = job["csv_path"]
+    elif "csv" in job:
+        source = io.StringIO(job["csv"])  # Row batch sent as CSV text, header included
+    else:
+        raise ValueError("Job must contain 'csv_path' or 'csv'")
+
+    if name == "ontologies2":
+        # Jobs are mapped in the handler thread: forking a process pool from a
+        # multithreaded server can deadlock
+        graph = builders[name].convert(source, workers=1)
+    else:
+        graph = builders[name].convert(source)
+    if isinstance(graph, tuple):
+        graph = graph[0]  # csv_to_ttl also returns its statistics
+    return graph.serialize(format=fmt), len(graph), output_formats[fmt]
+
+
+class ConversionHandler(BaseHTTPRequestHandler):
+    def _send(self, status, body, content_type, headers=None):
+        data = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path != "/health":
+            self._send(404, json.dumps({"error": "Not found"}), "application/json")
+            return
+        status = {"builders": sorted(builders), "requests": request_counter["count"]}
+        self._send(200, json.dumps(status), "application/json")
+
+    def do_POST(self):
+        if self.path != "/convert":
+            self._send(404, json.dumps({"error": "Not found"}), "application/json")
+            return
+        with counter_lock:
+            request_counter["count"] += 1
+            request_id = request_counter["count"]
+
+        start = time.perf_counter()
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            job = json.loads(self.rfile.read(length))
+            body, triples, content_type = run_job(job)
+        except Exception as e:
+            latency = (time.perf_counter() - start) * 1000
+            print(f"[JOB {request_id}] FAILED in {latency:.1f} ms: {e}")
+            self._send(400, json.dumps({"error": str(e)}), "application/json",
+                       {"X-Latency-Ms": f"{latency:.1f}"})
+            return
+
+        latency = (time.perf_counter() - start) * 1000
+        print(f"[JOB {request_id}] {job.get('builder', 'csv_to_ttl')}: {triples} triples in {latency:.1f} ms")
+        self._send(200, body, content_type, {"X-Triples": str(triples), "X-Latency-Ms": f"{latency:.1f}"})
+
+    def log_message(self, format, *args):
+        pass  # Jobs are already reported with their latency
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Keep the KG builders resident and serve conversion jobs over localhost HTTP.")
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on")
+    parser.add_argument("--port", type=int, default=8765, help="port to listen on")
+    parser.add_argument("--builders", nargs="+", default=available_builders, choices=available_builders,
+                        help="builders to load at startup")
+    args = parser.parse_args()
+
+    load_builders(args.builders)
+    server = ThreadingHTTPServer((args.host, args.port), ConversionHandler)
+    print(f"Conversion service listening on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nShutting down conversion service")
+        server.server_close()
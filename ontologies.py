@@ -4,21 +4,16 @@ from rdflib import Graph, URIRef, BNode, Literal, Namespace
 from rdflib.namespace import RDF, RDFS, XSD, FOAF
 from urllib.request import urlopen
 from urllib.error import URLError
-
-# Create RDF Graph
-kg = Graph()
+from kg_io import open_input, write_graph, compression_level
 
 # Define Namespaces
 SCHEMA = Namespace("https://schema.org/")
 EMO = Namespace("http://www.semanticweb.org/emotion/")
 SAREF = Namespace("https://saref.etsi.org/core/")
-kg.bind("schema", SCHEMA)
-kg.bind("foaf", FOAF)
-kg.bind("emo", EMO)
-kg.bind("saref", SAREF)
 
 # CSV file path
 csv_path = "ontologies_test_2.csv"
+ttl_output = "knowledge_graph_dynamic.ttl"
 
 # Load external ontologies with error handling
 def load_rdf_ontology(url, format="xml"):
@@ -48,40 +43,85 @@ def load_rdf_ontology(url, format="xml"):
         print(f"Error loading ontology {url}: {e}")
         return Graph()  # Return empty graph on error
 
+# Compact record of an ontology term (class or property)
+class VocabularyEntry:
+    __slots__ = ("uri", "name", "kind", "label")
+
+    def __init__(self, uri, name, kind, label):
+        self.uri = uri      # Full URI of the term
+        self.name = name    # Lowercase local name used for matching
+        self.kind = kind    # RDFS.Class or RDF.Property
+        self.label = label  # rdfs:label, if any
+
+# Vocabulary table keeping only the terms used for matching, instead of the full ontology graph
+class VocabularyTable:
+    def __init__(self):
+        self.entries = {RDFS.Class: [], RDF.Property: []}
+        self.exact = {RDFS.Class: {}, RDF.Property: {}}
+
+    def __len__(self):
+        return sum(len(entries) for entries in self.entries.values())
+
+    def add(self, uri, kind, label=None):
+        name = str(uri).split("/")[-1].lower()
+        entry = VocabularyEntry(URIRef(uri), name, kind, label)
+        self.entries[kind].append(entry)
+        self.exact[kind].setdefault(name, entry)  # Keep the first term with this local name
+
+    def terms(self, kind):
+        return self.entries[kind]
+
+    def find_exact(self, term, kind):
+        entry = self.exact[kind].get(term)
+        return entry.uri if entry else None
+
+    def find_partial(self, term, kind):
+        for entry in self.entries[kind]:
+            if term in entry.name or entry.name in term:
+                return entry.uri
+        return None
+
+# Build a vocabulary table from the classes and properties of an ontology graph
+def build_vocabulary(ont_graph):
+    vocabulary = VocabularyTable()
+    for kind in (RDFS.Class, RDF.Property):
+        for term in ont_graph.subjects(RDF.type, kind):
+            if isinstance(term, URIRef):
+                label = ont_graph.value(term, RDFS.label)
+                vocabulary.add(term, kind, str(label) if label is not None else None)
+    return vocabulary
+
+# Load an ontology, keep its vocabulary table and drop the full graph
+def load_vocabulary(url, format="xml"):
+    ont_graph = load_rdf_ontology(url, format=format)
+    vocabulary = build_vocabulary(ont_graph)
+    print(f"Vocabulary extracted from {len(ont_graph)} triples: {len(vocabulary)} terms")
+    return vocabulary
+
 # Load ontologies
-schema_graph = load_rdf_ontology("https://schema.org/version/latest/schemaorg-current-https.ttl", format="turtle")
-print(f"Schema.org ontology loaded with {len(schema_graph)} triples")
+schema_vocab = load_vocabulary("https://schema.org/version/latest/schemaorg-current-https.ttl", format="turtle")
+print(f"Schema.org vocabulary loaded with {len(schema_vocab)} terms")
 
 # Local EMO ontology - if available use this, otherwise proceed without
-emo_graph = Graph()
 emo_file = "EMO.owl"
 if os.path.exists(emo_file):
-    emo_graph.parse(emo_file, format="xml")
-    print(f"Local EMO ontology loaded with {len(emo_graph)} triples")
+    emo_vocab = load_vocabulary(f"file:{emo_file}", format="xml")
+    print(f"Local EMO vocabulary loaded with {len(emo_vocab)} terms")
 else:
+    emo_vocab = VocabularyTable()
     print("No local EMO ontology found, proceeding without it")
 
 # SAREF ontology
-saref_graph = load_rdf_ontology("https://saref.etsi.org/core/saref.ttl", format="turtle")
-print(f"SAREF ontology loaded with {len(saref_graph)} triples")
+saref_vocab = load_vocabulary("https://saref.etsi.org/core/saref.ttl", format="turtle")
+print(f"SAREF vocabulary loaded with {len(saref_vocab)} terms")
 
-# Entity classification storage
-entity_classes = {}
-
-def find_class_in_ontology(term, graph, namespace): # Function to find a class in an ontology
+def find_class_in_ontology(term, vocabulary, namespace): # Function to find a class in an ontology
     term = term.lower().replace(" ", "_")
     
-    # Try exact match
-    for cls in graph.subjects(RDF.type, RDFS.Class):
-        cls_name = str(cls).split("/")[-1].lower()
-        if cls_name == term:
-            return URIRef(cls)
-    
-    # Try partial match
-    for cls in graph.subjects(RDF.type, RDFS.Class):
-        cls_name = str(cls).split("/")[-1].lower()
-        if term in cls_name or cls_name in term:
-            return URIRef(cls)
+    # Try exact match, then partial match
+    cls = vocabulary.find_exact(term, RDFS.Class) or vocabulary.find_partial(term, RDFS.Class)
+    if cls is not None:
+        return cls
     
     # Fall back to namespace with term
     return namespace[term]
@@ -89,29 +129,17 @@ def find_class_in_ontology(term, graph, namespace): # Function to find a class i
 def get_predicate_uri(predicate): # Function to get the URI of a predicate
     term = predicate.lower().replace(" ", "_")
     
-    # Try in Schema.org
-    for pred in schema_graph.subjects(RDF.type, RDF.Property):
-        pred_name = str(pred).split("/")[-1].lower()
-        if pred_name == term:
-            return URIRef(pred)
+    # Try exact matches in Schema.org and SAREF
+    for vocabulary in (schema_vocab, saref_vocab):
+        pred = vocabulary.find_exact(term, RDF.Property)
+        if pred is not None:
+            return pred
     
-    # Try in SAREF
-    for pred in saref_graph.subjects(RDF.type, RDF.Property):
-        pred_name = str(pred).split("/")[-1].lower()
-        if pred_name == term:
-            return URIRef(pred)
-    
-    # Try partial matches in Schema.org
-    for pred in schema_graph.subjects(RDF.type, RDF.Property):
-        pred_name = str(pred).split("/")[-1].lower()
-        if term in pred_name or pred_name in term:
-            return URIRef(pred)
-    
-    # Try partial matches in SAREF
-    for pred in saref_graph.subjects(RDF.type, RDF.Property):
-        pred_name = str(pred).split("/")[-1].lower()
-        if term in pred_name or pred_name in term:
-            return URIRef(pred)
+    # Try partial matches in Schema.org and SAREF
+    for vocabulary in (schema_vocab, saref_vocab):
+        pred = vocabulary.find_partial(term, RDF.Property)
+        if pred is not None:
+            return pred
     
     # Map some common predicates to known URIs
     predicate_map = {
@@ -133,7 +161,7 @@ def get_predicate_uri(predicate): # Function to get the URI of a predicate
     # Default to schema namespace
     return SCHEMA[term]
 
-def infer_class(entity, predicate=None): # Function to infer class of an entity
+def infer_class(entity, entity_classes, predicate=None): # Function to infer class of an entity, cached per conversion
     if entity in entity_classes:
         return entity_classes[entity]
     
@@ -159,20 +187,14 @@ def infer_class(entity, predicate=None): # Function to infer class of an entity
         # Try finding entity in ontologies
         entity_term = entity.lower().replace(" ", "_")
         
-        # Check in Schema.org
-        for cls in schema_graph.subjects(RDF.type, RDFS.Class):
-            cls_name = str(cls).split("/")[-1].lower()
-            if entity_term == cls_name or entity_term in cls_name:
-                inferred_class = URIRef(cls)
-                break
-        
-        # Check in EMO ontology
-        if inferred_class == SCHEMA.Thing:
-            for cls in emo_graph.subjects(RDF.type, RDFS.Class):
-                cls_name = str(cls).split("/")[-1].lower()
-                if entity_term == cls_name or entity_term in cls_name:
-                    inferred_class = URIRef(cls)
+        # Check in Schema.org, then in EMO ontology
+        for vocabulary in (schema_vocab, emo_vocab):
+            for cls in vocabulary.terms(RDFS.Class):
+                if entity_term == cls.name or entity_term in cls.name:
+                    inferred_class = cls.uri
                     break
+            if inferred_class != SCHEMA.Thing:
+                break
     
     entity_classes[entity] = inferred_class
     return inferred_class
@@ -212,13 +234,20 @@ def extract_attributes(row):
 
     return attributes
 
-# Process the CSV file
-try:
-    with open(csv_path, 'r', newline='', encoding='utf-8') as csvfile:
-        # Detect CSV format
-        sample = csvfile.read(1024)
-        csvfile.seek(0)
-                
+# Function to build the Knowledge Graph from a CSV file path (.csv, .csv.gz, .csv.xz) or file-like object
+def convert(source):
+    # Create RDF Graph
+    kg = Graph()
+    kg.bind("schema", SCHEMA)
+    kg.bind("foaf", FOAF)
+    kg.bind("emo", EMO)
+    kg.bind("saref", SAREF)
+
+    # Entity classification storage, local to this conversion
+    entity_classes = {}
+
+    csvfile = open_input(source) if isinstance(source, str) else source
+    try:
         # CSV reader with appropriate configuration
         csv_reader = csv.reader(csvfile, quotechar='"', doublequote=True)
         header = next(csv_reader)  # Skip header
@@ -244,8 +273,8 @@ try:
             print(f"Parsed: Subject={subject}, Predicate={predicate}, Object={obj}, Timespamp={timestamp} Attributes={attributes}")
             
             # Create URIs
-            subj_class = infer_class(subject)
-            obj_class = infer_class(obj, predicate)
+            subj_class = infer_class(subject, entity_classes)
+            obj_class = infer_class(obj, entity_classes, predicate)
             
             # Use appropriate namespace based on class
             if subj_class == FOAF.Person:
@@ -283,15 +312,25 @@ try:
             else:
                 # Normal triple without additional properties
                 kg.add((subj_uri, pred_uri, obj_uri))
-    
-    # Print graph statistics
-    print(f"Knowledge Graph contains {len(kg)} triples")
-    
-    # Save graph to TTL file
-    kg.serialize("knowledge_graph_dynamic.ttl", format="turtle")
-    print("Knowledge Graph saved as 'knowledge_graph_dynamic.ttl'")
-    
-except Exception as e:
-    print(f"Error processing data: {e}")
-    import traceback
-    traceback.print_exc()
\ No newline at end of file
+    finally:
+        if isinstance(source, str):
+            csvfile.close()
+
+    return kg
+
+# Process the CSV file
+if __name__ == "__main__":
+    try:
+        kg = convert(csv_path)
+
+        # Print graph statistics
+        print(f"Knowledge Graph contains {len(kg)} triples")
+        
+        # Save graph to TTL file
+        write_graph(kg, ttl_output, compression_level)
+        print(f"Knowledge Graph saved as '{ttl_output}'")
+        
+    except Exception as e:
+        print(f"Error processing data: {e}")
+        import traceback
+        traceback.print_exc()
@@ -2,15 +2,22 @@ import pandas as pd
 from rdflib import Graph, Namespace, URIRef, Literal
 from rdflib.namespace import XSD, FOAF, PROV, SSN, SOSA, RDFS
 import re
+import os
+from concurrent.futures import ProcessPoolExecutor
 import nltk
 from nltk.corpus import wordnet
 from nltk.stem import WordNetLemmatizer
 import string
+from kg_io import open_input, write_graph, compression_level
 
-nltk.download('wordnet')
-nltk.download('punkt')
 lemmatizer = WordNetLemmatizer()
 
+# Download the NLTK data once, in the main process. Not done at import time because
+# worker processes started with spawn (the default on macOS) re-import this module.
+def download_nltk_data():
+    nltk.download('wordnet')
+    nltk.download('punkt')
+
 # Namespaces
 SCHEMA = Namespace("http://schema.org/")
 SOSA = Namespace("http://www.w3.org/ns/sosa/")
@@ -19,17 +26,12 @@ PROV = Namespace("http://www.w3.org/ns/prov#")
 FOAF = Namespace("http://xmlns.com/foaf/0.1/")
 
 csv_path = "/Users/camilla/Desktop/HDT/ontologies_test_2.csv"
-df = pd.read_csv(csv_path, header=None, dtype=str, engine="python")
-df = df[0].str.extract(r'\(([^,]+),\s*([^,]+),\s*([^)]+)\),([\d-]+\s[\d:]+),\"?(.*?)\"?$')
-df.columns = ["subject", "predicate", "object", "timestamp", "attributes"]
-df = df.fillna("None")
-
-g = Graph()
-g.bind("schema", SCHEMA, override=True)
-g.bind("foaf", FOAF, override=True)
-g.bind("sosa", SOSA, override=True)
-g.bind("ssn", SSN, override=True)
-g.bind("prov", PROV, override=True)
+ttl_output = "/Users/camilla/Desktop/HDT/output.ttl"
+
+# Parallel mapping: the CSV is split into chunks of `chunk_size` rows and each
+# chunk is mapped on a separate process. Set num_workers = 1 to map on a single core.
+num_workers = os.cpu_count() or 1
+chunk_size = 50000
 
 namespaces = {
     "schema": SCHEMA,
@@ -210,35 +212,88 @@ def get_ontology_name(uri):
             return ns_name
     return "custom"
 
-for _, row in df.iterrows():
-    subj = clean_uri(row["subject"])
-    original_pred = row["predicate"]
-    pred_str = original_pred.lower().strip()
-    obj = clean_uri(row["object"])
-
-    category = find_category_for_term(pred_str)
-    pred = find_best_property_in_category(pred_str, category)
-
-    if pred is None or pred_str == "none":
-        print(f"[SKIP] No property for predicate: '{original_pred}'")
-        continue
-
-    timestamp_fixed = fix_datetime(row["timestamp"])
-    if timestamp_fixed is None:
-        print(f"[SKIP] Invalid date: {row['timestamp']}")
-        continue
-
-    timestamp_literal = Literal(timestamp_fixed, datatype=XSD.dateTime)
-    g.add((subj, pred, obj))
-    # if pred is equal to the generic property of the category, add the original predicate
-    if pred == category["properties"]["generic"]:
-        g.add((subj, RDFS.label, Literal(original_pred)))
-        g.add((obj, RDFS.label, Literal(original_pred)))
-    g.add((subj, PROV.generatedAtTime, timestamp_literal))
-    g.add((pred, PROV.generatedAtTime, timestamp_literal))
-    g.add((obj, PROV.generatedAtTime, timestamp_literal))
-    print(f"[ADD] {subj.split('/')[-1]} -- {original_pred} --> {obj.split('/')[-1]} ({get_ontology_name(pred)})")
+def init_worker():
+    # Each worker has its own copy of the module (forked from the parent, or
+    # re-imported with spawn), so it builds its own lemmatizer and loads WordNet once
+    global lemmatizer
+    lemmatizer = WordNetLemmatizer()
+    wordnet.ensure_loaded()
 
-ttl_output = "/Users/camilla/Desktop/HDT/output.ttl"
-g.serialize(destination=ttl_output, format="turtle")
-print(f"Turtle file saved at: {ttl_output}")
\ No newline at end of file
+def map_chunk(chunk):
+    triples = []
+    messages = []
+    for _, row in chunk.iterrows():
+        subj = clean_uri(row["subject"])
+        original_pred = row["predicate"]
+        pred_str = original_pred.lower().strip()
+        obj = clean_uri(row["object"])
+
+        category = find_category_for_term(pred_str)
+        pred = find_best_property_in_category(pred_str, category)
+
+        if pred is None or pred_str == "none":
+            messages.append(f"[SKIP] No property for predicate: '{original_pred}'")
+            continue
+
+        timestamp_fixed = fix_datetime(row["timestamp"])
+        if timestamp_fixed is None:
+            messages.append(f"[SKIP] Invalid date: {row['timestamp']}")
+            continue
+
+        timestamp_literal = Literal(timestamp_fixed, datatype=XSD.dateTime)
+        triples.append((subj, pred, obj))
+        # if pred is equal to the generic property of the category, add the original predicate
+        if pred == category["properties"]["generic"]:
+            triples.append((subj, RDFS.label, Literal(original_pred)))
+            triples.append((obj, RDFS.label, Literal(original_pred)))
+        triples.append((subj, PROV.generatedAtTime, timestamp_literal))
+        triples.append((pred, PROV.generatedAtTime, timestamp_literal))
+        triples.append((obj, PROV.generatedAtTime, timestamp_literal))
+        messages.append(f"[ADD] {subj.split('/')[-1]} -- {original_pred} --> {obj.split('/')[-1]} ({get_ontology_name(pred)})")
+    return triples, messages
+
+def split_chunks(df, size):
+    for start in range(0, len(df), size):
+        yield df.iloc[start:start + size]
+
+def map_dataframe(df, workers=None, size=None):
+    # Defaults are read when called, so changes to num_workers/chunk_size apply
+    workers = num_workers if workers is None else workers
+    size = chunk_size if size is None else size
+    if workers <= 1 or len(df) <= size:
+        yield map_chunk(df)
+        return
+    # executor.map returns results in submission order, so the merged graph is deterministic
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker) as executor:
+        yield from executor.map(map_chunk, split_chunks(df, size))
+
+def load_dataframe(source):
+    if isinstance(source, str):
+        with open_input(source) as f:
+            return load_dataframe(f)
+    df = pd.read_csv(source, header=None, dtype=str, engine="python")
+    df = df[0].str.extract(r'\(([^,]+),\s*([^,]+),\s*([^)]+)\),([\d-]+\s[\d:]+),\"?(.*?)\"?$')
+    df.columns = ["subject", "predicate", "object", "timestamp", "attributes"]
+    return df.fillna("None")
+
+# Build the graph from a CSV file path (.csv, .csv.gz, .csv.xz) or file-like object
+def convert(source, workers=None):
+    g = Graph()
+    g.bind("schema", SCHEMA, override=True)
+    g.bind("foaf", FOAF, override=True)
+    g.bind("sosa", SOSA, override=True)
+    g.bind("ssn", SSN, override=True)
+    g.bind("prov", PROV, override=True)
+
+    for triples, messages in map_dataframe(load_dataframe(source), workers):
+        for message in messages:
+            print(message)
+        for triple in triples:
+            g.add(triple)
+    return g
+
+if __name__ == "__main__":
+    download_nltk_data()
+    g = convert(csv_path)
+    write_graph(g, ttl_output, compression_level)
+    print(f"Turtle file saved at: {ttl_output}")